@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import time
+from typing import List
+from urllib.parse import quote
+
+
+async def fetch(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str, etag: str = None) -> dict:
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip\r\n"
+    if etag:
+        request += f"If-None-Match: {etag}\r\n"
+    writer.write((request + "\r\n").encode("latin-1"))
+    await writer.drain()
+
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in header_lines:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return {"status": int(status_line.split(" ")[1]), "headers": headers, "body": body}
+
+
+async def worker(host: str, port: int, paths: List[str], deadline: float, latencies: List[float], statuses: dict, revalidate: float):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        while time.perf_counter() < deadline:
+            path = random.choice(paths)
+            etag = etags.get(path) if random.random() < revalidate else None
+            start = time.perf_counter()
+            response = await fetch(reader, writer, host, path, etag)
+            latencies.append(time.perf_counter() - start)
+            statuses[response["status"]] = statuses.get(response["status"], 0) + 1
+            if "etag" in response["headers"]:
+                etags[path] = response["headers"]["etag"]
+    finally:
+        writer.close()
+
+
+async def get_paths(host: str, port: int) -> List[str]:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        response = await fetch(reader, writer, host, "/terms")
+    finally:
+        writer.close()
+    body = response["body"]
+    if response["headers"].get("content-encoding") == "gzip":
+        body = gzip.decompress(body)
+    terms = json.loads(body)
+
+    paths = ["/terms", "/movers"]
+    for term in terms:
+        paths.append(f"/terms/{quote(term)}")
+        paths.append(f"/terms/{quote(term)}?start=2026-01-01")
+    return paths
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run(host: str, port: int, concurrency: int, duration: float, revalidate: float):
+    paths = await get_paths(host, port)
+    latencies: List[float] = []
+    statuses: dict = {}
+
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*[worker(host, port, paths, deadline, latencies, statuses, revalidate) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests over {elapsed:.1f}s with {concurrency} connections")
+    print(f"  requests/sec: {len(latencies) / elapsed:.0f}")
+    print(f"  p50 latency:  {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"  p99 latency:  {percentile(latencies, 0.99) * 1000:.2f} ms")
+    print(f"  statuses:     {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for api_server.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--revalidate", type=float, default=0.5, help="fraction of requests sent with If-None-Match")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.host, args.port, args.concurrency, args.duration, args.revalidate))
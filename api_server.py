@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from zoneinfo import ZoneInfo
+
+from scores import SENTIMENT_BASE_DIR, term_score, get_movers
+
+POLL_INTERVAL = 2.0
+MIN_GZIP_SIZE = 512
+MAX_HEADER_SIZE = 16384
+MAX_CACHED_RESPONSES = 4096
+
+STATUS_TEXT = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def term_to_slug(term: str) -> str:
+    return term.replace(" ", "-").lower()
+
+
+class SentimentCache:
+    """In-memory copy of every term's scores-avg.json, reloaded when a file changes."""
+
+    def __init__(self, base_dir: str = SENTIMENT_BASE_DIR):
+        self.base_dir = base_dir
+        self.version = 0
+        self.terms: Dict[str, Dict[str, float]] = {}
+        self.slugs: Dict[str, str] = {}
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._responses: Dict[Tuple[str, bool, str], Tuple[int, bytes, str, bool]] = {}
+
+    def refresh(self) -> bool:
+        """Reloads changed or new terms and drops deleted ones. Returns True on change."""
+        stats = {}
+        if os.path.exists(self.base_dir):
+            for term in os.listdir(self.base_dir):
+                if term.startswith("."):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.base_dir, term, "scores-avg.json"))
+                except FileNotFoundError:
+                    continue
+                stats[term] = (st.st_mtime_ns, st.st_size)
+
+        if stats == self._stats:
+            return False
+
+        terms = {}
+        for term, stat in stats.items():
+            if self._stats.get(term) == stat and term in self.terms:
+                terms[term] = self.terms[term]
+                continue
+            try:
+                with open(os.path.join(self.base_dir, term, "scores-avg.json"), "r") as f:
+                    terms[term] = json.load(f)
+            except (OSError, ValueError):
+                # A half-written file; keep the old copy and retry on the next poll.
+                stats.pop(term)
+                if term in self.terms:
+                    terms[term] = self.terms[term]
+
+        self.terms = terms
+        self.slugs = {term_to_slug(term): term for term in terms}
+        self._stats = stats
+        self._responses.clear()
+        self.version += 1
+        return True
+
+    async def watch(self, interval: float = POLL_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            self.refresh()
+
+    def resolve_term(self, name: str) -> str:
+        if name in self.terms:
+            return name
+        if term_to_slug(name) in self.slugs:
+            return self.slugs[term_to_slug(name)]
+        raise ApiError(404, f"Unknown term '{name}'.")
+
+    def response(self, target: str, accept_gzip: bool) -> Tuple[int, bytes, str, bool]:
+        """Returns (status, body, etag, gzipped), memoized until the data or UTC day changes."""
+        key = (target, accept_gzip, str(datetime.now(ZoneInfo("UTC")).date()))
+        if key not in self._responses:
+            if len(self._responses) >= MAX_CACHED_RESPONSES:
+                self._responses.clear()
+            try:
+                status, payload = 200, route(self, target)
+            except ApiError as e:
+                status, payload = e.status, {"error": str(e)}
+            body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+            gzipped = accept_gzip and len(body) >= MIN_GZIP_SIZE
+            if gzipped:
+                body = gzip.compress(body, compresslevel=6, mtime=0)
+            # Hashing the encoded body gives gzip and identity responses distinct strong ETags.
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            self._responses[key] = (status, body, etag, gzipped)
+        return self._responses[key]
+
+
+def parse_day(value: Optional[str], name: str) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        return str(datetime.strptime(value, "%Y-%m-%d").date())
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be a YYYY-MM-DD date.")
+
+
+def route(cache: SentimentCache, target: str):
+    """
+    GET /terms                                  -> list of tracked terms
+    GET /terms/<term>?start=YYYY-MM-DD&end=...  -> that term's daily series
+    GET /days/<YYYY-MM-DD>                      -> every term's score on a day
+    GET /movers?count=3                         -> top/bottom movers and terms
+    """
+    url = urlsplit(target)
+    parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+    if parts == ["terms"]:
+        return sorted(cache.terms)
+
+    if len(parts) == 2 and parts[0] == "terms":
+        term = cache.resolve_term(parts[1])
+        start = parse_day(query.get("start"), "start")
+        end = parse_day(query.get("end"), "end")
+        series = {
+            day: score for day, score in sorted(cache.terms[term].items())
+            if (start is None or day >= start) and (end is None or day <= end)
+        }
+        return {"term": term, "series": series}
+
+    if len(parts) == 2 and parts[0] == "days":
+        day = parse_day(parts[1], "day")
+        return {"date": day, "scores": {term: avg_data.get(day, 0.0) for term, avg_data in sorted(cache.terms.items())}}
+
+    if parts == ["movers"]:
+        try:
+            count = int(query.get("count", 3))
+        except ValueError:
+            raise ApiError(400, "'count' must be an integer.")
+        term_scores = [term_score(term, avg_data) for term, avg_data in cache.terms.items()]
+        return get_movers(term_scores, max(count, 0))
+
+    raise ApiError(404, f"No route for '{url.path}'.")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+def build_response(status: int, headers: Dict[str, str], body: bytes = b"") -> bytes:
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def handle_connection(cache: SentimentCache, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, version = request_line.split(" ")
+            except ValueError:
+                writer.write(build_response(400, {"Content-Length": "0", "Connection": "close"}))
+                break
+
+            headers = {}
+            for line in header_lines:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+            # Request bodies are ignored, but must be drained to keep the connection usable.
+            try:
+                content_length = int(headers.get("content-length", 0) or 0)
+                if content_length < 0:
+                    raise ValueError(content_length)
+            except ValueError:
+                writer.write(build_response(400, {"Content-Length": "0", "Connection": "close"}))
+                break
+            if content_length:
+                try:
+                    await reader.readexactly(content_length)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            connection = "keep-alive" if keep_alive else "close"
+
+            if method not in ("GET", "HEAD"):
+                writer.write(build_response(405, {"Allow": "GET, HEAD", "Content-Length": "0", "Connection": connection}))
+            else:
+                accept_gzip = "gzip" in headers.get("accept-encoding", "")
+                status, body, etag, gzipped = cache.response(target, accept_gzip)
+                response_headers = {
+                    "Content-Type": "application/json",
+                    "ETag": etag,
+                    "Cache-Control": "no-cache",
+                    "Vary": "Accept-Encoding",
+                    "Connection": connection,
+                }
+                if gzipped:
+                    response_headers["Content-Encoding"] = "gzip"
+
+                if status == 200 and etag_matches(headers.get("if-none-match", ""), etag):
+                    writer.write(build_response(304, response_headers))
+                else:
+                    response_headers["Content-Length"] = str(len(body))
+                    writer.write(build_response(status, response_headers, b"" if method == "HEAD" else body))
+
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int, base_dir: str = SENTIMENT_BASE_DIR, poll_interval: float = POLL_INTERVAL):
+    cache = SentimentCache(base_dir)
+    cache.refresh()
+    watcher = asyncio.create_task(cache.watch(poll_interval))
+    server = await asyncio.start_server(lambda r, w: handle_connection(cache, r, w), host, port, limit=MAX_HEADER_SIZE)
+    print(f"Serving {len(cache.terms)} terms from {base_dir} on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read-only JSON API over sentiment-files.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data", default=SENTIMENT_BASE_DIR)
+    parser.add_argument("--poll", type=float, default=POLL_INTERVAL, help="seconds between file change checks")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.data, args.poll))
+    except KeyboardInterrupt:
+        pass
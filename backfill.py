@@ -0,0 +1,336 @@
+import argparse
+import json
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional, Set, Tuple
+
+import praw
+
+import tracker
+from tracker import (
+    ensure_term_dir, stable_hash, analyze_post_sentiments, migrate_legacy_raw_data,
+    load_summary, load_post_hashes, month_key, save_new_records, append_raw_records,
+    serialize_avg_data, compute_smoothed_avg_from_totals,
+)
+
+REPO_SENTIMENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sentiment-files")
+BACKFILL_STATE_FILE = "backfill-state.json"
+BACKFILL_SPOOL_FILE = "backfill-spool.jsonl"
+BACKFILL_SAVING_FILE = "backfill-saving.jsonl"
+SEARCH_LIMIT = 1000  # Reddit stops paging a listing after ~1000 results
+PAGE_SIZE = 100
+REQUESTS_PER_MINUTE = 90
+BATCH_SIZE = 64
+
+# Every (sort, time_filter) pair is a separate listing with its own 1000-post
+# cap, so together they reach much further back than the "hot" listing.
+SEARCH_WINDOWS = [
+    (sort, time_filter)
+    for time_filter in ("week", "month", "year", "all")
+    for sort in ("new", "top", "comments", "relevance")
+]
+
+
+class RateLimiter:
+    """Spaces out requests shared by all search threads."""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60 / requests_per_minute if requests_per_minute > 0 else 0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+@dataclass
+class FakeSubmission:
+    title: str
+    selftext: str
+    created_utc: float
+
+
+class FakeSubreddit:
+    FILTER_DAYS = {"hour": 1, "day": 1, "week": 7, "month": 30, "year": 365, "all": 3650}
+
+    def __init__(self, page_latency: float):
+        self.page_latency = page_latency
+
+    def search(self, query: str, sort: str = "relevance", time_filter: str = "all", limit: int = 100):
+        # Posts are drawn from a pool shared by every sort of the same
+        # time_filter, so overlapping windows return duplicates like Reddit does.
+        rng = random.Random(f"{query}:{time_filter}:{sort}")
+        days = self.FILTER_DAYS[time_filter]
+        now = time.time()
+        for i in range(limit):
+            if i % PAGE_SIZE == 0:
+                time.sleep(self.page_latency)
+            post_id = rng.randrange(limit * 2)
+            age = random.Random(f"{query}:{time_filter}:{post_id}").random() * days * 86400
+            yield FakeSubmission(f"{query} {time_filter} post {post_id}", "", now - age)
+
+
+class FakeReddit:
+    """Stands in for praw.Reddit so a backfill can run offline."""
+
+    is_fake = True
+
+    def __init__(self, page_latency: float = 0.05):
+        self.page_latency = page_latency
+
+    def subreddit(self, name: str) -> FakeSubreddit:
+        return FakeSubreddit(self.page_latency)
+
+
+def fake_sentiments(texts: List[str]) -> List[float]:
+    return [(stable_hash(text) % 5 - 2) / 2 for text in texts]
+
+
+fake_sentiments.is_fake = True
+
+
+def make_reddit() -> praw.Reddit:
+    return praw.Reddit(
+        client_id=os.getenv('REDDIT_CLIENT_ID'),
+        client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
+        user_agent="crawler"
+    )
+
+
+def window_key(window: Tuple[str, str]) -> str:
+    return ":".join(window)
+
+
+def load_backfill_state(term: str) -> Set[str]:
+    path = os.path.join(ensure_term_dir(term), BACKFILL_STATE_FILE)
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r") as f:
+        return set(json.load(f).get("done_windows", []))
+
+
+def serialize_backfill_state(term: str, done_windows: Set[str]):
+    with open(os.path.join(ensure_term_dir(term), BACKFILL_STATE_FILE), "w") as f:
+        json.dump({"done_windows": sorted(done_windows)}, f, indent=2)
+
+
+def load_spool(term: str, name: str = BACKFILL_SPOOL_FILE) -> List[Tuple[str, int, float]]:
+    path = os.path.join(ensure_term_dir(term), name)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return [tuple(json.loads(line)) for line in f if line.strip()]
+
+
+def finish_interrupted_save(term: str):
+    """
+    Completes a save that was cut off after the spool was renamed for saving.
+
+    Records already appended to the segments are skipped; load_summary then
+    rebuilds the months whose segments grew past the recorded sizes.
+    """
+    saving_path = os.path.join(ensure_term_dir(term), BACKFILL_SAVING_FILE)
+    if not os.path.exists(saving_path):
+        return
+
+    records = load_spool(term, BACKFILL_SAVING_FILE)
+    stored_hashes = load_post_hashes(term, [record[0] for record in records], load_summary(term))
+    append_raw_records(term, [record for record in records if record[1] not in stored_hashes])
+    summary = load_summary(term)
+    serialize_avg_data(term, compute_smoothed_avg_from_totals(summary.days))
+    os.remove(saving_path)
+    print(f"{term}: finished saving {len(records)} posts from an interrupted backfill")
+
+
+def backfill_term(
+    term: str,
+    reddit_factory: Callable[[], object] = make_reddit,
+    score_batch: Callable[[List[str]], List[float]] = analyze_post_sentiments,
+    workers: int = 4,
+    batch_size: int = BATCH_SIZE,
+    requests_per_minute: float = REQUESTS_PER_MINUTE,
+) -> int:
+    """
+    Searches Reddit across SEARCH_WINDOWS concurrently and saves the history in one write.
+
+    Scored batches are spooled to disk and finished windows are recorded, so
+    an interrupted backfill picks up where it stopped. Returns the number of
+    new posts saved.
+    """
+    # The client is checked rather than the factory so that wrapped factories
+    # are caught too; creating a praw.Reddit makes no requests.
+    is_fake = getattr(score_batch, "is_fake", False) or getattr(reddit_factory(), "is_fake", False)
+    if is_fake and os.path.realpath(tracker.SENTIMENT_BASE_DIR) == os.path.realpath(REPO_SENTIMENT_DIR):
+        raise ValueError(f"Refusing to write fake backfill data into {REPO_SENTIMENT_DIR}; point tracker.SENTIMENT_BASE_DIR elsewhere.")
+
+    migrate_legacy_raw_data(term)
+    finish_interrupted_save(term)
+    summary = load_summary(term)
+    term_dir = ensure_term_dir(term)
+    spool_path = os.path.join(term_dir, BACKFILL_SPOOL_FILE)
+
+    records = load_spool(term)
+    seen_hashes = set(record[1] for record in records)
+    loaded_months: Set[str] = set()
+    done_windows = load_backfill_state(term)
+    windows = [window for window in SEARCH_WINDOWS if window_key(window) not in done_windows]
+    if records or done_windows:
+        print(f"Resuming {term}: {len(records)} scored posts, {len(done_windows)} windows done")
+
+    limiter = RateLimiter(requests_per_minute)
+    clients = threading.local()
+
+    def thread_client():
+        # PRAW is not thread safe, so each pool thread creates one client and
+        # reuses it across windows. Its first request also fetches an OAuth
+        # token, which is paced by the shared limiter.
+        if not hasattr(clients, "reddit"):
+            limiter.wait()
+            clients.reddit = reddit_factory()
+        return clients.reddit
+
+    messages: queue.Queue = queue.Queue(maxsize=batch_size * 4)
+    stop = threading.Event()
+
+    def send(message: tuple):
+        while not stop.is_set():
+            try:
+                messages.put(message, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def search_window(window: Tuple[str, str]):
+        error: Optional[Exception] = None
+        try:
+            sort, time_filter = window
+            listing = iter(thread_client().subreddit("all").search(term, sort=sort, time_filter=time_filter, limit=SEARCH_LIMIT))
+            fetched = 0
+            while not stop.is_set():
+                # PRAW fetches a listing PAGE_SIZE posts per request.
+                if fetched % PAGE_SIZE == 0:
+                    limiter.wait()
+                post = next(listing, None)
+                if post is None:
+                    break
+                fetched += 1
+                send(("post", post.title + "\n" + post.selftext, post.created_utc))
+        except Exception as e:
+            error = e
+        finally:
+            send(("done", window, error))
+
+    pending: List[Tuple[str, int, str]] = []
+
+    def flush():
+        if not pending:
+            return
+        scores = score_batch([text for _, _, text in pending])
+        batch = [(date_key, text_hash, score) for (date_key, text_hash, _), score in zip(pending, scores)]
+        with open(spool_path, "a") as f:
+            f.writelines(json.dumps(record) + "\n" for record in batch)
+        records.extend(batch)
+        pending.clear()
+
+    posts_fetched = 0
+    failed = []
+    start = time.monotonic()
+    last_report = start
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for window in windows:
+            pool.submit(search_window, window)
+
+        try:
+            remaining = len(windows)
+            while remaining:
+                kind, *payload = messages.get()
+                if kind == "done":
+                    window, error = payload
+                    flush()
+                    remaining -= 1
+                    if error is None:
+                        done_windows.add(window_key(window))
+                        serialize_backfill_state(term, done_windows)
+                    else:
+                        failed.append((window, error))
+                    continue
+
+                text, created_utc = payload
+                posts_fetched += 1
+                date_key = str(datetime.fromtimestamp(created_utc).date())
+                if month_key(date_key) not in loaded_months:
+                    loaded_months.add(month_key(date_key))
+                    seen_hashes |= load_post_hashes(term, [date_key], summary)
+
+                text_hash = stable_hash(text)
+                if text_hash not in seen_hashes:
+                    seen_hashes.add(text_hash)
+                    pending.append((date_key, text_hash, text))
+                    if len(pending) >= batch_size:
+                        flush()
+
+                if time.monotonic() - last_report >= 5:
+                    last_report = time.monotonic()
+                    print(f"{term}: {posts_fetched} fetched, {len(records)} scored, "
+                          f"{posts_fetched / (last_report - start):.1f} posts/sec")
+        finally:
+            # Unblocks the search threads if scoring failed; the spool is kept for a rerun.
+            stop.set()
+
+    elapsed = max(time.monotonic() - start, 1e-9)
+    # Renaming the spool first means a crash during the save is finished by
+    # finish_interrupted_save instead of the records being appended twice.
+    saving_path = os.path.join(term_dir, BACKFILL_SAVING_FILE)
+    if os.path.exists(spool_path):
+        os.replace(spool_path, saving_path)
+    save_new_records(term, summary, records)
+    if os.path.exists(saving_path):
+        os.remove(saving_path)
+
+    for window, error in failed:
+        print(f"{term}: window {window_key(window)} failed ({error}); rerun to resume it")
+    if not failed:
+        os.remove(os.path.join(term_dir, BACKFILL_STATE_FILE))
+
+    print(f"{term}: saved {len(records)} new posts from {posts_fetched} fetched in {elapsed:.1f}s "
+          f"({posts_fetched / elapsed:.1f} posts/sec)")
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill a term's history from Reddit search.")
+    parser.add_argument("terms", nargs="+")
+    parser.add_argument("--workers", type=int, default=4, help="search windows fetched at once")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--requests-per-minute", type=float, default=REQUESTS_PER_MINUTE, help="0 disables the limit")
+    parser.add_argument("--fake", action="store_true", help="use a fake Reddit client and scorer (offline)")
+    parser.add_argument("--data", help="sentiment-files directory to write to (a scratch directory with --fake)")
+    args = parser.parse_args()
+
+    if args.data:
+        tracker.SENTIMENT_BASE_DIR = args.data
+    elif args.fake:
+        tracker.SENTIMENT_BASE_DIR = tempfile.mkdtemp(prefix="backfill-fake-")
+    print(f"Writing to {tracker.SENTIMENT_BASE_DIR}")
+
+    for term in args.terms:
+        backfill_term(
+            term,
+            reddit_factory=FakeReddit if args.fake else make_reddit,
+            score_batch=fake_sentiments if args.fake else analyze_post_sentiments,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            requests_per_minute=0 if args.fake else args.requests_per_minute,
+        )
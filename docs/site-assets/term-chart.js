@@ -0,0 +1,56 @@
+const ctx = document.getElementById('sentimentChart').getContext('2d');
+
+const recentLabels = allLabels.slice(-30);
+const recentScores = allScores.slice(-30);
+
+const gradient = ctx.createLinearGradient(0, 0, 0, 400);
+gradient.addColorStop(0, 'rgba(144, 238, 144, 0.3)');
+gradient.addColorStop(0.5, 'rgba(255, 255, 255, 0)');
+gradient.addColorStop(1, 'rgba(255, 182, 193, 0.2)');
+
+const sentimentChart = new Chart(ctx, {
+    type: 'line',
+    data: {
+        labels: recentLabels,
+        datasets: [{
+            label: 'Sentiment Score',
+            data: recentScores,
+            fill: true,
+            borderColor: '#183660',
+            backgroundColor: gradient,
+            tension: 0.3,
+            pointRadius: 2,
+        }]
+    },
+    options: {
+        scales: {
+            y: {
+                min: -1,
+                max: 1,
+                grid: {
+                    drawBorder: true,
+                    color: function(context) {
+                        if (context.tick.value === 0) {
+                            return '#000';
+                        }
+                        return '#e0e0e0';
+                    },
+                    lineWidth: function(context) {
+                        return context.tick.value === 0 ? 2 : 1;
+                    }
+                }
+            },
+            x: {
+                ticks: {
+                    autoSkip: true,
+                    maxTicksLimit: 10
+                }
+            }
+        },
+        plugins: {
+            legend: {
+                display: false
+            }
+        }
+    }
+});
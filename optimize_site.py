@@ -0,0 +1,197 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Callable, Dict, List, Set
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HTML_BASE_DIR = "docs"
+ASSETS_DIR = "site-assets"
+STYLESHEET = "style.css"
+HASH_LENGTH = 10
+MANIFEST_FILE = ".asset-manifest.json"
+COMPRESSED_SUFFIXES = (".gz", ".br")
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".svg", ".ttf")
+NAMED_PAGES = {"index.html": "index", "about.html": "about", "term-list.html": "term list"}
+
+_FINGERPRINTED_RE = re.compile(r"^.+\.[0-9a-f]{%d}\.[^.]+$" % HASH_LENGTH)
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE_RE = re.compile(r"\s+")
+_CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,])\s*")
+
+
+def _strip_lines(text: str, drop: Callable[[str], bool] = lambda line: False) -> str:
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line and not drop(line)) + "\n"
+
+
+def minify_html(text: str) -> str:
+    # Newlines are kept so inline scripts keep their statement breaks and
+    # inline elements keep the whitespace between them.
+    return _strip_lines(text)
+
+
+def minify_js(text: str) -> str:
+    if len(text) / (text.count("\n") + 1) > 200:
+        # Long lines mean the file is already minified (e.g. the vendored Chart.js).
+        return text
+    return _strip_lines(text, drop=lambda line: line.startswith("//"))
+
+
+def minify_css(text: str) -> str:
+    text = _CSS_SPACE_RE.sub(" ", _CSS_COMMENT_RE.sub("", text))
+    return _CSS_PUNCTUATION_RE.sub(r"\1", text).replace(";}", "}").strip() + "\n"
+
+
+MINIFIERS: Dict[str, Callable[[str], str]] = {
+    ".html": minify_html,
+    ".svg": minify_html,
+    ".js": minify_js,
+    ".css": minify_css,
+}
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def rewrite_references(text: str, fingerprints: Dict[str, str]) -> str:
+    for path, fingerprinted in fingerprints.items():
+        for quote in ('"', "'"):
+            text = text.replace(f"{quote}{path}{quote}", f"{quote}{fingerprinted}{quote}")
+    return text
+
+
+def write_compressed(path: str, data: bytes) -> Dict[str, int]:
+    """Writes .gz and (if brotli is installed) .br siblings, returning their sizes."""
+    sizes = {}
+    compressed = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed[".br"] = brotli.compress(data, quality=11)
+
+    for suffix, blob in compressed.items():
+        sizes[suffix] = len(blob)
+        with open(path + suffix, "wb") as f:
+            f.write(blob)
+    return sizes
+
+
+def fingerprint_assets(html_dir: str) -> Dict[str, str]:
+    """Writes minified, content-hashed copies of site-assets and the stylesheet.
+
+    Returns a map from each original path (relative to html_dir) to its
+    fingerprinted path. The stylesheet is done last so that its url()
+    references point at fingerprinted assets.
+    """
+    assets_dir = os.path.join(html_dir, ASSETS_DIR)
+    sources = sorted(
+        f"{ASSETS_DIR}/{name}" for name in os.listdir(assets_dir)
+        if not _FINGERPRINTED_RE.match(name) and not name.endswith(COMPRESSED_SUFFIXES)
+    )
+    sources.append(STYLESHEET)
+
+    fingerprints = {}
+    for path in sources:
+        with open(os.path.join(html_dir, path), "rb") as f:
+            data = f.read()
+        root, ext = os.path.splitext(path)
+        if ext in MINIFIERS:
+            data = MINIFIERS[ext](rewrite_references(data.decode("utf-8"), fingerprints)).encode("utf-8")
+
+        fingerprinted = f"{root}.{content_hash(data)}{ext}"
+        with open(os.path.join(html_dir, fingerprinted), "wb") as f:
+            f.write(data)
+        fingerprints[path] = fingerprinted
+    return fingerprints
+
+
+def update_manifest(html_dir: str, fingerprints: Dict[str, str]) -> Set[str]:
+    """
+    Records this build's fingerprinted assets and returns the ones to keep.
+
+    The previous build's assets are kept as well, since HTML cached by the CDN
+    still points at them for a while after a deploy. Rebuilding without asset
+    changes keeps the same previous set instead of dropping it.
+    """
+    path = os.path.join(html_dir, MANIFEST_FILE)
+    manifest = {"current": [], "previous": []}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            manifest = json.load(f)
+
+    current = sorted(set(fingerprints.values()))
+    previous = manifest["previous"] if manifest["current"] == current else manifest["current"]
+    with open(path, "w") as f:
+        json.dump({"current": current, "previous": previous}, f, indent=2)
+    return set(current) | set(previous)
+
+
+def remove_stale_outputs(html_dir: str, keep: Set[str]):
+    for directory in (html_dir, os.path.join(html_dir, ASSETS_DIR)):
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, html_dir).replace(os.sep, "/")
+            base = path[:-3] if name.endswith(COMPRESSED_SUFFIXES) else path
+            base_relative = relative[:-3] if name.endswith(COMPRESSED_SUFFIXES) else relative
+            if _FINGERPRINTED_RE.match(os.path.basename(base)) and base_relative not in keep:
+                os.remove(path)
+            elif name.endswith(COMPRESSED_SUFFIXES) and not os.path.exists(base):
+                os.remove(path)
+
+
+def page_type(name: str) -> str:
+    return NAMED_PAGES.get(name, "term pages")
+
+
+def print_report(report: Dict[str, Dict[str, int]]):
+    columns = ["files", "original", "minified", ".gz"] + ([".br"] if brotli is not None else [])
+    print(f"{'':<12}" + "".join(f"{column:>12}" for column in columns))
+    for kind, sizes in report.items():
+        print(f"{kind:<12}" + "".join(f"{sizes.get(column, 0):>12,}" for column in columns))
+    if brotli is None:
+        print("brotli is not installed; skipped .br output.")
+
+
+def optimize_site(html_dir: str = HTML_BASE_DIR):
+    """Minifies, fingerprints and pre-compresses the generated site in place."""
+    report: Dict[str, Dict[str, int]] = {}
+
+    def record(kind: str, original: int, minified: int, compressed: Dict[str, int]):
+        sizes = report.setdefault(kind, {"files": 0, "original": 0, "minified": 0})
+        sizes["files"] += 1
+        sizes["original"] += original
+        sizes["minified"] += minified
+        for suffix, size in compressed.items():
+            sizes[suffix] = sizes.get(suffix, 0) + size
+
+    fingerprints = fingerprint_assets(html_dir)
+
+    pages: List[str] = sorted(name for name in os.listdir(html_dir) if name.endswith(".html"))
+    for name in pages:
+        path = os.path.join(html_dir, name)
+        with open(path, "r", encoding="utf-8") as f:
+            original = f.read()
+        data = minify_html(rewrite_references(original, fingerprints)).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(data)
+        record(page_type(name), len(original.encode("utf-8")), len(data), write_compressed(path, data))
+
+    for source, fingerprinted in fingerprints.items():
+        path = os.path.join(html_dir, fingerprinted)
+        with open(path, "rb") as f:
+            data = f.read()
+        compressed = write_compressed(path, data) if fingerprinted.endswith(COMPRESSIBLE_EXTENSIONS) else {}
+        record("assets", os.path.getsize(os.path.join(html_dir, source)), len(data), compressed)
+
+    remove_stale_outputs(html_dir, update_manifest(html_dir, fingerprints))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    optimize_site(sys.argv[1] if len(sys.argv) > 1 else HTML_BASE_DIR)
@@ -1,6 +1,7 @@
 import time
 
-from setup_pages import generate_index, generate_term_page, generate_about, generate_term_list
+from setup_pages import generate_index, generate_term_page, generate_about, generate_term_list, generate_terms_script, HTML_BASE_DIR
+from optimize_site import optimize_site
 from tracker import add_term, get_term_list, RawData
 
 
@@ -12,8 +13,10 @@ if __name__ == "__main__":
             print(term, time.time()-start)
             add_term(term)
     term_list = get_term_list()
-    term_scores = generate_index()
+    term_scores = generate_index(term_list)
     generate_about()
+    generate_terms_script(term_list)
     generate_term_list(term_list, term_scores)
     for term in term_list:
         generate_term_page(term)
+    optimize_site(HTML_BASE_DIR)
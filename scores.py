@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple, Union
+from zoneinfo import ZoneInfo
+
+# Shared by the site build and the API server; kept free of tracker's Reddit
+# and model imports so the server can use it.
+SENTIMENT_BASE_DIR = "./sentiment-files"
+MAX_LOOKBACK_DAYS = 5
+MOVER_THRESHOLD = 0.15
+
+TermScore = Dict[str, Union[str, float]]
+
+
+def latest_scores(avg_data: Dict[str, float]) -> Tuple[float, float]:
+    """Returns (today, yesterday) scores, stepping back up to MAX_LOOKBACK_DAYS until both days have data."""
+    today = datetime.now(ZoneInfo("UTC")).date()
+    yesterday = today - timedelta(days=1)
+    n = 0
+
+    while (str(today) not in avg_data or str(yesterday) not in avg_data) and n < MAX_LOOKBACK_DAYS:
+        today = yesterday
+        yesterday = today - timedelta(days=1)
+        n += 1
+    return avg_data.get(str(today), 0.0), avg_data.get(str(yesterday), 0.0)
+
+
+def term_score(term: str, avg_data: Dict[str, float]) -> TermScore:
+    today_score, yesterday_score = latest_scores(avg_data)
+    return {"term": term, "today_score": today_score, "change": today_score - yesterday_score}
+
+
+def get_movers(term_scores: List[TermScore], count: int = 3) -> Dict[str, List[TermScore]]:
+    """Top movers leave out clearly negative terms, and bottom movers clearly positive ones."""
+    return {
+        "top_movers": sorted([s for s in term_scores if s["today_score"] > -MOVER_THRESHOLD], key=lambda x: -x["change"])[:count],
+        "bottom_movers": sorted([s for s in term_scores if s["today_score"] < MOVER_THRESHOLD], key=lambda x: x["change"])[:count],
+        "top_terms": sorted(term_scores, key=lambda x: -x["today_score"])[:count],
+        "bottom_terms": sorted(term_scores, key=lambda x: x["today_score"])[:count],
+    }
@@ -1,211 +1,104 @@
+import argparse
+import hashlib
 import os
-from datetime import datetime, timedelta
+import urllib.request
+from datetime import datetime
 from typing import List, Dict, Union
-from zoneinfo import ZoneInfo
 
+from scores import latest_scores, term_score, get_movers
 from tracker import get_term_list, load_avg_sentiment_scores, get_newsworthy_terms
+from templates import (
+    escape_html, escape_js, render_page, ABOUT_CONTENT, INDEX_CONTENT, INDEX_ROW, INDEX_CARD,
+    TERM_HEAD, TERM_CONTENT, TERM_SCRIPT, TERM_LIST_HEAD, TERM_LIST_CONTENT, TERM_LIST_ROW, TERMS_SCRIPT,
+)
+from optimize_site import optimize_site
 
 HTML_BASE_DIR = "docs"
+TERMS_SCRIPT_PATH = "site-assets/terms.js"
+CHART_JS_PATH = "site-assets/chart.umd.js"
+CHART_JS_URL = "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.js"
 
 def term_to_url(term: str) -> str:
     return  term.replace(" ", "-").lower()+".html"
 
-def generate_about():
+def last_updated() -> str:
+    return datetime.now().strftime("%I:%M%p on %B %d, %Y")
+
+def chart_js_src() -> str:
+    """Uses the committed Chart.js bundle if one has been vendored, otherwise the pinned CDN build."""
+    if os.path.exists(os.path.join(HTML_BASE_DIR, CHART_JS_PATH)):
+        return CHART_JS_PATH
+    return CHART_JS_URL
 
-    terms_list = get_term_list()
-    terms_json = str(terms_list).replace("'", '"')
-
-    html = f"""<link rel="stylesheet" href="style.css">
-<html>
-<head>
-    <script>const TERMS = {terms_json};</script>
-    <link rel="icon" type="image/x-icon" href="site-assets/favicon.svg">
-</head>
-
-<header class="site-header">
-  <div class="header-content">
-    <div class="logo">
-      <img src="site-assets/logo.svg" alt="Logo">
-    </div>
-    <nav class="nav-links">
-      <a href="index.html">Home</a>
-      <a href="term-list.html">List</a>
-      <a href="about.html">About</a>
-      <button class="search-button"><img src="site-assets/search.svg" alt="Search" class="search-icon"></button>
-    </nav>
-  </div>
-</header>
-
-<body>
-<div id="search-overlay" class="search-overlay" style="display: none;">
-    <div class="search-box">
-        <span><button class="close-search">X</button><input type="text" id="search-input" placeholder="Search for a term..." /></span>
-        <div id="search-results"></div>
-    </div>
-</div>
-
-<div class="topbox">
-  <h1>How it works</h1>
-</div>
-
-<div class="wrapper">
-
-<section class="about-section">
-  <h2>The Idea</h2>
-  <p>Every day, millions of conversations happen on the internet. We built this site to track how people feel about key topics over time. Why do we only search Reddit? Its API is the cheapest.</p>
-</section>
-
-<section class="about-section">
-  <h2>The Methodology</h2>
-  <p>We start with a curated list of 100 terms that we want to track. Every day at midnight MST, we search Reddit for new posts mentioning these terms. Each post is semantically analyzed and assigned a sentiment score from <strong>1 (very negative)</strong> to <strong>5 (very positive)</strong> based on how people are talking about it.</p>
-  <p>For each term, we average the scores across all the posts from that day. We scale that to create our scores, which go from -1 for highly negative sentiment to 1 for positive sentiment.</p>
-</section>
-
-<section class="about-section">
-  <h2>Notes</h2>
-  <ul>
-    <li>Sentiment scores are averaged across posts mentioning a term, not weighted by upvotes or engagement.</li>
-    <li>We use a plaintext search, so we don't look at related terms, only the term itself.</li>
-    <li>Posts are analyzed using semantic language models, but sentiment analysis is inherently subjective and imperfect.</li>
-  </ul>
-</section>
-
-</div>
-
-<div class="timenote">Last updated {datetime.now().strftime("%I:%M%p on %B %d, %Y")}</div>
-
-<script src="site-assets/search.js"></script>
-</body>
-</html>
-"""
-
-    with open(os.path.join(HTML_BASE_DIR, "about.html"), "w", encoding="utf-8") as f:
+def vendor_chart_js(expected_sha256: str):
+    """
+    Downloads the pinned Chart.js bundle into site-assets, refusing it unless
+    its SHA-256 matches. This is a one-off maintenance step whose output is
+    committed; the nightly build never fetches it.
+    """
+    with urllib.request.urlopen(CHART_JS_URL, timeout=30) as response:
+        bundle = response.read()
+    actual_sha256 = hashlib.sha256(bundle).hexdigest()
+    if actual_sha256 != expected_sha256.lower():
+        raise ValueError(f"Chart.js bundle has SHA-256 {actual_sha256}, expected {expected_sha256}; not vendoring it.")
+
+    local_path = os.path.join(HTML_BASE_DIR, CHART_JS_PATH)
+    with open(local_path, "wb") as f:
+        f.write(bundle)
+    print(f"Vendored {CHART_JS_URL} to {local_path}")
+
+def write_page(filename: str, html: str):
+    output_path = os.path.join(HTML_BASE_DIR, filename)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
         f.write(html)
 
+def generate_about():
+    write_page("about.html", render_page(ABOUT_CONTENT, last_updated()))
 
-def generate_index():
-    term_scores = []
 
-    term_list = get_term_list()
+def generate_terms_script(term_list: List[str]):
+    write_page(TERMS_SCRIPT_PATH, TERMS_SCRIPT.render(terms=escape_js(term_list)))
 
-    for term in term_list:
-        avg_data = load_avg_sentiment_scores(term)
-        today = datetime.now(ZoneInfo("UTC")).date()
-        yesterday = today - timedelta(days=1)
-        n = 0
-
-        while (str(today) not in avg_data or str(yesterday) not in avg_data) and n < 5:
-            today = yesterday
-            yesterday = today - timedelta(days=1)
-            n += 1
-        today_score = avg_data.get(str(today), 0.0)
-        yesterday_score = avg_data.get(str(yesterday), 0.0)
-
-        change = today_score - yesterday_score
-
-        term_scores.append({
-            "term": term,
-            "today_score": today_score,
-            "change": change,
-        })
 
-    newsworthy_terms = get_newsworthy_terms(term_list)
+def generate_index(term_list: List[str] = None):
+    if term_list is None:
+        term_list = get_term_list()
 
-    top_movers = sorted([term_score for term_score in term_scores if term_score["today_score"]>-0.15], key=lambda x: -x["change"])[:3]
-    bottom_movers = sorted([term_score for term_score in term_scores if term_score["today_score"]<0.15], key=lambda x: x["change"])[:3]
-    top_terms = sorted(term_scores, key=lambda x: -x["today_score"])[:3]
-    bottom_terms = sorted(term_scores, key=lambda x: x["today_score"])[:3]
-    in_the_news = [term_score for term_score in term_scores if term_score["term"] in newsworthy_terms]
-
-    html = """
-<link rel="stylesheet" href="style.css">
-<html>
-<head>
-    <link rel="icon" type="image/x-icon" href="site-assets/favicon.svg">
-</head>
-
-<header class="site-header">
-  <div class="header-content">
-    <div class="logo">
-      <img src="site-assets/logo.svg" alt="Logo">
-    </div>
-    <nav class="nav-links">
-      <a href="index.html">Home</a>
-      <a href="term-list.html">List</a>
-      <a href="about.html">About</a>
-      <button class="search-button"><img src="site-assets/search.svg" alt="Search" class="search-icon"></button>
-    </nav>
-  </div>
-</header>
-
-<body>
-<div id="search-overlay" class="search-overlay" style="display: none;">
-      <div class="search-box">
-          <span><button class="close-search">X</button><input type="text" id="search-input" placeholder="Search for a term..." /></span>
-          <div id="search-results"></div>
-      </div>
-</div>
-<div class="topbox">
-<h1>But how does Reddit feel about it?</h1>
-  <h2>We track sentiment across thousands of Reddit posts to show you how opinions change over time.</h2>
-</div>
-<div class="wrapper">
-
-"""
-
-    terms_list = get_term_list()
-    terms_json = str(terms_list).replace("'", '"')
-
-    html += f"""
-    <script>
-    const TERMS = {terms_json};
-    </script>
-    <script src="site-assets/search.js"></script>
-    """
+    term_scores = [term_score(term, load_avg_sentiment_scores(term)) for term in term_list]
+    movers = get_movers(term_scores, 3)
+
+    newsworthy_terms = get_newsworthy_terms(term_list)
+    in_the_news = [entry for entry in term_scores if entry["term"] in newsworthy_terms]
 
     def build_row(title, entries, key, icon_name, is_change=False):
-        nonlocal html
-        html += f"<div class='section'><div class='row-header'><img src='{icon_name}' class='row-icon'><h2>{title}</h2></div><div class='row'>"
+        cards = []
         for entry in entries:
             score = entry[key]
-            color_class = "positive" if score >= 0 else "negative"
-            display_score = f"{score:+.2f}"
-
             arrow = ""
             if is_change:
                 arrow = "↑" if score > 0 else "↓"
 
-            label = "Change" if is_change else "Score"
-
-            html += f"""
-            <div class="card {color_class}">
-                <a href="{term_to_url(entry['term'])}">
-                    <div class="term-name">{entry['term']}</div>
-                    <div class="score-section">
-                        <div class="score-value">{display_score} {arrow}</div>
-                        <div class="score-label">{label}</div>
-                    </div>
-                </a>
-            </div>
-            """
-        html += "</div></div>"
-
-    build_row("Popular Today", in_the_news, "change", "site-assets/rsi-hot.svg", is_change=True)
-    build_row("Top Movers Today", top_movers, "change", "site-assets/rsi-moving-up.svg", is_change=True)
-    build_row("Bottom Movers Today", bottom_movers, "change", "site-assets/rsi-moving-down.svg", is_change=True)
-    build_row("Top Terms", top_terms, "today_score", "site-assets/rsi-top.svg", is_change=False)
-    build_row("Bottom Terms", bottom_terms, "today_score", "site-assets/rsi-bottom.svg", is_change=False)
-
-    html += f"""
-</div>
-
-<div class="timenote">Last updated {datetime.now().strftime("%I:%M%p on %B %d, %Y")}</div>
-</body>
-</html>
-"""
-
-    with open(os.path.join(HTML_BASE_DIR, "index.html"), "w", encoding="utf-8") as f:
-        f.write(html)
+            cards.append(INDEX_CARD.render(
+                color_class="positive" if score >= 0 else "negative",
+                url=escape_html(term_to_url(entry["term"])),
+                term=escape_html(entry["term"]),
+                score=f"{score:+.2f}",
+                arrow=arrow,
+                label="Change" if is_change else "Score",
+            ))
+        return INDEX_ROW.render(icon=icon_name, title=title, cards="".join(cards))
+
+    rows = [
+        build_row("Popular Today", in_the_news, "change", "site-assets/rsi-hot.svg", is_change=True),
+        build_row("Top Movers Today", movers["top_movers"], "change", "site-assets/rsi-moving-up.svg", is_change=True),
+        build_row("Bottom Movers Today", movers["bottom_movers"], "change", "site-assets/rsi-moving-down.svg", is_change=True),
+        build_row("Top Terms", movers["top_terms"], "today_score", "site-assets/rsi-top.svg", is_change=False),
+        build_row("Bottom Terms", movers["bottom_terms"], "today_score", "site-assets/rsi-bottom.svg", is_change=False),
+    ]
+
+    content = INDEX_CONTENT.render(rows="\n".join(rows))
+    write_page("index.html", render_page(content, last_updated()))
 
     return term_scores
 
@@ -214,22 +107,9 @@ def generate_term_page(term: str):
     avg_data = load_avg_sentiment_scores(term)
 
     sorted_dates = sorted(avg_data.keys())
-    scores = [max(-1, min(1, avg_data[date])) for date in sorted_dates]
-
-    today = datetime.now(ZoneInfo("UTC")).date()
-    yesterday = today - timedelta(days=1)
-    n = 0
-
-    while (str(today) not in avg_data or str(yesterday) not in avg_data) and n < 5:
-        today = yesterday
-        yesterday = today - timedelta(days=1)
-        n += 1
-    today_score = avg_data.get(str(today), 0.0)
-    yesterday_score = avg_data.get(str(yesterday), 0.0)
-
-    terms_list = get_term_list()
-    terms_json = str(terms_list).replace("'", '"')
+    scores = [round(max(-1, min(1, avg_data[date])), 4) for date in sorted_dates]
 
+    today_score, yesterday_score = latest_scores(avg_data)
     change = today_score - yesterday_score
 
     descriptor = ""
@@ -263,268 +143,60 @@ def generate_term_page(term: str):
     score_display = f"{today_score:.3f}"
     change_display = f"{change_arrow} {abs(change):.3f}"
 
-    html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <title>Sentiment for {term}</title>
-    <link rel="stylesheet" href="style.css">
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <link rel="icon" type="image/x-icon" href="site-assets/favicon.svg">
-</head>
-<body>
-
-<div id="search-overlay" class="search-overlay" style="display: none;">
-      <div class="search-box">
-          <span><button class="close-search">X</button><input type="text" id="search-input" placeholder="Search for a term..." /></span>
-          <div id="search-results"></div>
-      </div>
-</div>
-
-<header class="site-header">
-  <div class="header-content">
-    <div class="logo">
-      <img src="site-assets/logo.svg" alt="Logo">
-    </div>
-    <nav class="nav-links">
-      <a href="index.html">Home</a>
-      <a href="term-list.html">List</a>
-      <a href="about.html">About</a>
-
-      <button class="search-button"><img src="site-assets/search.svg" alt="Search" class="search-icon"></button>
-    </nav>
-  </div>
-</header>
-
-
-<div class="wrapper">
-    <script>
-    const TERMS = {terms_json};
-    </script>
-    <script src="site-assets/search.js"></script>
-
-    <h1>Sentiment for “{term}” is <span class="{descriptor_class}">{descriptor}</span></h1>
-
-    <div class="score-change">
-        <div class="score-block">
-            <div class="label">Score</div>
-            <div class="score {descriptor_class}">{score_display}</div>
-        </div>
-        <div class="change-block">
-            <div class="label">Change</div>
-            <div class="change {change_class}">{change_display}</div>
-        </div>
-    </div>
-
-    <canvas id="sentimentChart" width="800" height="400"></canvas>
-</div>
-
-<script>
-    const ctx = document.getElementById('sentimentChart').getContext('2d');
-
-    const allLabels = {sorted_dates};
-    const allScores = {scores};
-
-    const recentLabels = allLabels.slice(-30);
-    const recentScores = allScores.slice(-30);
-
-    const gradient = ctx.createLinearGradient(0, 0, 0, 400);
-    gradient.addColorStop(0, 'rgba(144, 238, 144, 0.3)');
-    gradient.addColorStop(0.5, 'rgba(255, 255, 255, 0)');
-    gradient.addColorStop(1, 'rgba(255, 182, 193, 0.2)');
-
-    const sentimentChart = new Chart(ctx, {{
-        type: 'line',
-        data: {{
-            labels: recentLabels,
-            datasets: [{{
-                label: 'Sentiment Score',
-                data: recentScores,
-                fill: true,
-                borderColor: '#183660',
-                backgroundColor: gradient,
-                tension: 0.3,
-                pointRadius: 2,
-            }}]
-        }},
-        options: {{
-            scales: {{
-                y: {{
-                    min: -1,
-                    max: 1,
-                    grid: {{
-                        drawBorder: true,
-                        color: function(context) {{
-                            if (context.tick.value === 0) {{
-                                return '#000';
-                            }}
-                            return '#e0e0e0';
-                        }},
-                        lineWidth: function(context) {{
-                            return context.tick.value === 0 ? 2 : 1;
-                        }}
-                    }}
-                }},
-                x: {{
-                    ticks: {{
-                        autoSkip: true,
-                        maxTicksLimit: 10
-                    }}
-                }}
-            }},
-            plugins: {{
-                legend: {{
-                    display: false
-                }}
-            }}
-        }}
-    }});
-</script>
-
-<div class="timenote">Last updated {datetime.now().strftime("%I:%M%p on %B %d, %Y")}</div>
-
-</body>
-</html>
-"""
-
-    output_path = os.path.join(HTML_BASE_DIR, term_to_url(term))
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    content = TERM_CONTENT.render(
+        term=escape_html(term),
+        descriptor=descriptor,
+        descriptor_class=descriptor_class,
+        score=score_display,
+        change=change_display,
+        change_class=change_class,
+    )
+    html = render_page(
+        content,
+        last_updated(),
+        head=TERM_HEAD.render(term=escape_html(term), chart_js=escape_html(chart_js_src())),
+        scripts=TERM_SCRIPT.render(labels=escape_js(sorted_dates), scores=escape_js(scores)),
+    )
 
+    write_page(term_to_url(term), html)
 
 
-def generate_term_list(term_list: List[str], term_scores: List[Dict[str, Union[str, float]]]):
-    terms_json = str(term_list).replace("'", '"')
-
-    html = f"""
-<link rel="stylesheet" href="style.css">
-<html>
-<head>
-    <link rel="icon" type="image/x-icon" href="site-assets/favicon.svg">
-    <script>const TERMS = {terms_json};</script>
-    <script>
-function sortTable(columnIndex, isNumeric = false) {{
-  const table = document.getElementById("termsTable");
-  const tbody = table.tBodies[0];
-  const rowsArray = Array.from(tbody.rows);
-  const header = table.rows[0].cells[columnIndex];
-  const currentDir = header.getAttribute("data-dir") || "asc";
-  const newDir = currentDir === "asc" ? "desc" : "asc";
-  header.setAttribute("data-dir", newDir);
-
-  const comparator = (rowA, rowB) => {{
-    const cellA = rowA.cells[columnIndex].innerText.trim();
-    const cellB = rowB.cells[columnIndex].innerText.trim();
-
-    const aIsNegative = cellA.startsWith("-");
-    const bIsNegative = cellB.startsWith("-");
-
-    if (!aIsNegative && bIsNegative) return newDir === "asc" ? 1 : -1;
-    if (aIsNegative && !bIsNegative) return newDir === "asc" ? -1 : 1;
-
-    if (isNumeric) {{
-      const aVal = parseFloat(cellA);
-      const bVal = parseFloat(cellB);
-      return newDir === "asc" ? aVal - bVal : bVal - aVal;
-    }} else {{
-      return newDir === "asc"
-        ? cellA.localeCompare(cellB)
-        : cellB.localeCompare(cellA);
-    }}
-  }};
-
-  rowsArray.sort(comparator);
-
-  rowsArray.forEach(row => tbody.appendChild(row));
-}}
-    </script>
-</head>
-
-<header class="site-header">
-  <div class="header-content">
-    <div class="logo">
-      <img src="site-assets/logo.svg" alt="Logo">
-    </div>
-    <nav class="nav-links">
-      <a href="index.html">Home</a>
-      <a href="term-list.html">List</a>
-      <a href="about.html">About</a>
-      <button class="search-button"><img src="site-assets/search.svg" alt="Search" class="search-icon"></button>
-    </nav>
-  </div>
-</header>
-
-<body>
-<div id="search-overlay" class="search-overlay" style="display: none;">
-      <div class="search-box">
-          <span><button class="close-search">X</button><input type="text" id="search-input" placeholder="Search for a term..." /></span>
-          <div id="search-results"></div>
-      </div>
-</div>
-
-<div class="topbox">
-<h1>All Tracked Terms</h1>
-<h2>Click a header to sort alphabetically, by score, or by daily change.</h2>
-</div>
-
-<div class="table-wrapper">
-<table id="termsTable">
-<thead>
-<tr>
-    <th onclick="sortTable(0, false)"><span>Term</span><span><img src="site-assets/tablearrows.svg" alt="table arrows"></span></th>
-    <th onclick="sortTable(1, true)"><span>Today's Score</span><span><img src="site-assets/tablearrows.svg" alt="table arrows"></span></th>
-    <th onclick="sortTable(2, true)"><span>Change From Yesterday</span><span><img src="site-assets/tablearrows.svg" alt="table arrows"></span></th>
-</tr>
-</thead>
-<tbody>
-"""
 
+def generate_term_list(term_list: List[str], term_scores: List[Dict[str, Union[str, float]]]):
+    rows = []
     for entry in term_scores:
         term = entry['term']
         today_score_val = entry['today_score']
         change_val = entry['change']
 
-        today_score = f"{today_score_val:.3f}"
         arrow = "↑" if change_val >= 0 else "↓"
-        change = f"{change_val:+.3f}{arrow}"
-
-        score_class = "positive" if today_score_val >= 0 else "negative"
-        change_class = "positive" if change_val >= 0 else "negative"
-
-        html += f"""
-    <tr>
-        <td><a href="{term_to_url(term)}">{term}</a></td>
-        <td class="{score_class}">{today_score}</td>
-        <td class="{change_class}">{change}</td>
-    </tr>
-    """
-
-    html += f"""
-</tbody>
-</table>
-</div>
 
-<div class="timenote">Last updated {datetime.now().strftime("%I:%M%p on %B %d, %Y")}</div>
+        rows.append(TERM_LIST_ROW.render(
+            url=escape_html(term_to_url(term)),
+            term=escape_html(term),
+            score=f"{today_score_val:.3f}",
+            score_class="positive" if today_score_val >= 0 else "negative",
+            change=f"{change_val:+.3f}{arrow}",
+            change_class="positive" if change_val >= 0 else "negative",
+        ))
 
-<script src="site-assets/search.js"></script>
-
-</body>
-</html>
-"""
-
-    output_path = os.path.join(HTML_BASE_DIR, term_to_url("term-list"))
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    content = TERM_LIST_CONTENT.render(rows="".join(rows))
+    write_page(term_to_url("term-list"), render_page(content, last_updated(), head=TERM_LIST_HEAD))
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the static site in docs/.")
+    parser.add_argument("--vendor-chart-js", metavar="SHA256", help=f"download {CHART_JS_URL} into site-assets if it matches SHA256, then exit")
+    args = parser.parse_args()
+    if args.vendor_chart_js:
+        vendor_chart_js(args.vendor_chart_js)
+        raise SystemExit
+
     term_list = get_term_list()
-    term_scores = generate_index()
+    term_scores = generate_index(term_list)
     generate_about()
+    generate_terms_script(term_list)
     generate_term_list(term_list, term_scores)
     for term in term_list:
         generate_term_page(term)
-
+    optimize_site(HTML_BASE_DIR)
@@ -0,0 +1,239 @@
+import html
+import json
+import re
+from functools import lru_cache
+
+_FIELD_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template:
+    """A page template compiled once into literal parts and {{ field }} slots.
+
+    Rendering only fills the slots and joins the parts, so values must already
+    be escaped for the context they are placed in.
+    """
+
+    def __init__(self, source: str):
+        self._parts = _FIELD_RE.split(source)
+        self.fields = self._parts[1::2]
+
+    def render(self, **values) -> str:
+        parts = self._parts[:]
+        parts[1::2] = [str(values[name]) for name in self.fields]
+        return "".join(parts)
+
+
+def escape_html(value) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def escape_js(value) -> str:
+    """Serializes value as a JS literal that is safe inside a <script> block."""
+    return json.dumps(value, separators=(",", ":")).replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026")
+
+
+HEADER = """<header class="site-header">
+  <div class="header-content">
+    <div class="logo">
+      <img src="site-assets/logo.svg" alt="Logo">
+    </div>
+    <nav class="nav-links">
+      <a href="index.html">Home</a>
+      <a href="term-list.html">List</a>
+      <a href="about.html">About</a>
+      <button class="search-button"><img src="site-assets/search.svg" alt="Search" class="search-icon"></button>
+    </nav>
+  </div>
+</header>"""
+
+SEARCH_OVERLAY = """<div id="search-overlay" class="search-overlay" style="display: none;">
+    <div class="search-box">
+        <span><button class="close-search">X</button><input type="text" id="search-input" placeholder="Search for a term..." /></span>
+        <div id="search-results"></div>
+    </div>
+</div>"""
+
+FOOTER = Template("""<div class="timenote">Last updated {{ last_updated }}</div>
+
+<script src="site-assets/terms.js"></script>
+<script src="site-assets/search.js"></script>""")
+
+TERMS_SCRIPT = Template("""const TERMS = {{ terms }};
+""")
+
+PAGE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+{{ head }}    <link rel="stylesheet" href="style.css">
+    <link rel="icon" type="image/x-icon" href="site-assets/favicon.svg">
+</head>
+<body>
+{{ header }}
+
+{{ search_overlay }}
+
+{{ content }}
+
+{{ scripts }}
+{{ footer }}
+</body>
+</html>
+""")
+
+
+@lru_cache(maxsize=None)
+def render_footer(last_updated: str) -> str:
+    return FOOTER.render(last_updated=escape_html(last_updated))
+
+
+def render_page(content: str, last_updated: str, head: str = "", scripts: str = "") -> str:
+    return PAGE.render(
+        head=head,
+        header=HEADER,
+        search_overlay=SEARCH_OVERLAY,
+        content=content,
+        scripts=scripts,
+        footer=render_footer(last_updated),
+    )
+
+
+ABOUT_CONTENT = """<div class="topbox">
+  <h1>How it works</h1>
+</div>
+
+<div class="wrapper">
+
+<section class="about-section">
+  <h2>The Idea</h2>
+  <p>Every day, millions of conversations happen on the internet. We built this site to track how people feel about key topics over time. Why do we only search Reddit? Its API is the cheapest.</p>
+</section>
+
+<section class="about-section">
+  <h2>The Methodology</h2>
+  <p>We start with a curated list of 100 terms that we want to track. Every day at midnight MST, we search Reddit for new posts mentioning these terms. Each post is semantically analyzed and assigned a sentiment score from <strong>1 (very negative)</strong> to <strong>5 (very positive)</strong> based on how people are talking about it.</p>
+  <p>For each term, we average the scores across all the posts from that day. We scale that to create our scores, which go from -1 for highly negative sentiment to 1 for positive sentiment.</p>
+</section>
+
+<section class="about-section">
+  <h2>Notes</h2>
+  <ul>
+    <li>Sentiment scores are averaged across posts mentioning a term, not weighted by upvotes or engagement.</li>
+    <li>We use a plaintext search, so we don't look at related terms, only the term itself.</li>
+    <li>Posts are analyzed using semantic language models, but sentiment analysis is inherently subjective and imperfect.</li>
+  </ul>
+</section>
+
+</div>"""
+
+INDEX_CONTENT = Template("""<div class="topbox">
+<h1>But how does Reddit feel about it?</h1>
+  <h2>We track sentiment across thousands of Reddit posts to show you how opinions change over time.</h2>
+</div>
+<div class="wrapper">
+{{ rows }}
+</div>""")
+
+INDEX_ROW = Template("""<div class='section'><div class='row-header'><img src='{{ icon }}' class='row-icon'><h2>{{ title }}</h2></div><div class='row'>{{ cards }}</div></div>""")
+
+INDEX_CARD = Template("""
+<div class="card {{ color_class }}">
+    <a href="{{ url }}">
+        <div class="term-name">{{ term }}</div>
+        <div class="score-section">
+            <div class="score-value">{{ score }} {{ arrow }}</div>
+            <div class="score-label">{{ label }}</div>
+        </div>
+    </a>
+</div>""")
+
+TERM_HEAD = Template("""    <title>Sentiment for {{ term }}</title>
+    <script src="{{ chart_js }}"></script>
+""")
+
+TERM_CONTENT = Template("""<div class="wrapper">
+    <h1>Sentiment for “{{ term }}” is <span class="{{ descriptor_class }}">{{ descriptor }}</span></h1>
+
+    <div class="score-change">
+        <div class="score-block">
+            <div class="label">Score</div>
+            <div class="score {{ descriptor_class }}">{{ score }}</div>
+        </div>
+        <div class="change-block">
+            <div class="label">Change</div>
+            <div class="change {{ change_class }}">{{ change }}</div>
+        </div>
+    </div>
+
+    <canvas id="sentimentChart" width="800" height="400"></canvas>
+</div>""")
+
+TERM_SCRIPT = Template("""<script>
+    const allLabels = {{ labels }};
+    const allScores = {{ scores }};
+</script>
+<script src="site-assets/term-chart.js"></script>""")
+
+TERM_LIST_HEAD = """    <script>
+function sortTable(columnIndex, isNumeric = false) {
+  const table = document.getElementById("termsTable");
+  const tbody = table.tBodies[0];
+  const rowsArray = Array.from(tbody.rows);
+  const header = table.rows[0].cells[columnIndex];
+  const currentDir = header.getAttribute("data-dir") || "asc";
+  const newDir = currentDir === "asc" ? "desc" : "asc";
+  header.setAttribute("data-dir", newDir);
+
+  const comparator = (rowA, rowB) => {
+    const cellA = rowA.cells[columnIndex].innerText.trim();
+    const cellB = rowB.cells[columnIndex].innerText.trim();
+
+    const aIsNegative = cellA.startsWith("-");
+    const bIsNegative = cellB.startsWith("-");
+
+    if (!aIsNegative && bIsNegative) return newDir === "asc" ? 1 : -1;
+    if (aIsNegative && !bIsNegative) return newDir === "asc" ? -1 : 1;
+
+    if (isNumeric) {
+      const aVal = parseFloat(cellA);
+      const bVal = parseFloat(cellB);
+      return newDir === "asc" ? aVal - bVal : bVal - aVal;
+    } else {
+      return newDir === "asc"
+        ? cellA.localeCompare(cellB)
+        : cellB.localeCompare(cellA);
+    }
+  };
+
+  rowsArray.sort(comparator);
+
+  rowsArray.forEach(row => tbody.appendChild(row));
+}
+    </script>
+"""
+
+TERM_LIST_CONTENT = Template("""<div class="topbox">
+<h1>All Tracked Terms</h1>
+<h2>Click a header to sort alphabetically, by score, or by daily change.</h2>
+</div>
+
+<div class="table-wrapper">
+<table id="termsTable">
+<thead>
+<tr>
+    <th onclick="sortTable(0, false)"><span>Term</span><span><img src="site-assets/tablearrows.svg" alt="table arrows"></span></th>
+    <th onclick="sortTable(1, true)"><span>Today's Score</span><span><img src="site-assets/tablearrows.svg" alt="table arrows"></span></th>
+    <th onclick="sortTable(2, true)"><span>Change From Yesterday</span><span><img src="site-assets/tablearrows.svg" alt="table arrows"></span></th>
+</tr>
+</thead>
+<tbody>{{ rows }}
+</tbody>
+</table>
+</div>""")
+
+TERM_LIST_ROW = Template("""
+    <tr>
+        <td><a href="{{ url }}">{{ term }}</a></td>
+        <td class="{{ score_class }}">{{ score }}</td>
+        <td class="{{ change_class }}">{{ change }}</td>
+    </tr>""")
@@ -2,23 +2,34 @@ import hashlib
 import os
 import re
 import json
+import shutil
 import time
 import itertools
 from dataclasses import dataclass, field, asdict
+from functools import lru_cache
 from datetime import datetime, timedelta, date
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Set, Tuple, Iterable, Iterator, Optional
 from zoneinfo import ZoneInfo
 
 import praw
 from praw.models import Submission
 from transformers import pipeline
 
+from scores import SENTIMENT_BASE_DIR
+
 
-SENTIMENT_BASE_DIR = "./sentiment-files"
 DAYS = 365
 
+RAW_DIR_NAME = "raw"
+SUMMARY_FILE = "summary.json"
+LEGACY_RAW_FILE = "scores-raw.json"
+LEGACY_HASHES_FILE = "legacy-hashes.txt"
+MIGRATION_STAGING_DIR = "raw.migrating"
+
 
-sentiment_pipeline = pipeline("sentiment-analysis", model="nlptown/bert-base-multilingual-uncased-sentiment")
+@lru_cache(maxsize=1)
+def get_sentiment_pipeline():
+    return pipeline("sentiment-analysis", model="nlptown/bert-base-multilingual-uncased-sentiment")
 
 reddit = praw.Reddit(
     client_id=os.getenv('REDDIT_CLIENT_ID'), # or my_secrets.client_id,
@@ -44,6 +55,31 @@ class RawData:
             post_texts=set([x for x in data.get("post_texts", []) if isinstance(x, int)])
         )
 
+@dataclass
+class TermSummary:
+    days: Dict[str, List[float]] = field(default_factory=dict)  # date -> [count, sum]
+    legacy_cutoff: Optional[str] = None
+    segment_sizes: Dict[str, int] = field(default_factory=dict)  # month -> bytes covered by days
+
+    def add(self, date_key: str, score: float):
+        count, total = self.days.get(date_key, [0, 0.0])
+        self.days[date_key] = [count + 1, total + score]
+
+    def to_dict(self):
+        return {
+            "days": self.days,
+            "legacy_cutoff": self.legacy_cutoff,
+            "segment_sizes": self.segment_sizes
+        }
+
+    @staticmethod
+    def from_dict(data: dict):
+        return TermSummary(
+            days=data.get("days", {}),
+            legacy_cutoff=data.get("legacy_cutoff"),
+            segment_sizes=data.get("segment_sizes", {})
+        )
+
 def ensure_term_dir(term: str):
     term_dir = os.path.join(SENTIMENT_BASE_DIR, term)
     os.makedirs(term_dir, exist_ok=True)
@@ -72,22 +108,199 @@ def stable_hash(text: str) -> int:
     return int(hashlib.sha256(text.encode("utf-8")).hexdigest(), 16)
 
 def analyze_post_sentiment(text: str) -> float:
-    result = sentiment_pipeline(text[:512])[0]
-    stars = int(result['label'].split()[0])
-    return (stars - 3) / 2
+    return analyze_post_sentiments([text])[0]
 
-def serialize_raw_data(term: str, data: RawData):
-    term_dir = ensure_term_dir(term)
-    with open(os.path.join(term_dir, "scores-raw.json"), "w") as f:
-        json.dump(data.to_dict(), f, indent=2)
+def analyze_post_sentiments(texts: List[str]) -> List[float]:
+    results = get_sentiment_pipeline()([text[:512] for text in texts], batch_size=len(texts), truncation=True)
+    return [(int(result['label'].split()[0]) - 3) / 2 for result in results]
+
+def month_key(date_key: str) -> str:
+    return date_key[:7]
+
+def raw_partition_path(term: str, month: str) -> str:
+    return os.path.join(ensure_term_dir(term), RAW_DIR_NAME, f"{month}.jsonl")
+
+def list_raw_partitions(term: str) -> List[str]:
+    raw_dir = os.path.join(ensure_term_dir(term), RAW_DIR_NAME)
+    if not os.path.exists(raw_dir):
+        return []
+    return sorted(name[:-len(".jsonl")] for name in os.listdir(raw_dir) if name.endswith(".jsonl"))
+
+def truncate_partial_line(path: str) -> int:
+    """Cuts off a last line left without its newline by an interrupted append. Returns the new size."""
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            start = max(0, end - 4096)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            f.truncate(end)
+        return end
+
+def read_segment_sizes(term: str) -> Dict[str, int]:
+    """Returns each segment's size in bytes, after dropping any partially written last line."""
+    return {month: truncate_partial_line(raw_partition_path(term, month)) for month in list_raw_partitions(term)}
+
+def append_raw_records(term: str, records: List[Tuple[str, int, float]], raw_dir: str = None) -> Dict[str, int]:
+    """
+    Appends (date, hash, score) records to their monthly segment files in raw_dir (the term's raw/ by default).
+
+    Returns the new size of each segment written to.
+    """
+    by_month: Dict[str, List[str]] = {}
+    for date_key, text_hash, score in records:
+        by_month.setdefault(month_key(date_key), []).append(json.dumps([date_key, text_hash, score]) + "\n")
+
+    sizes = {}
+    for month, lines in by_month.items():
+        path = raw_partition_path(term, month) if raw_dir is None else os.path.join(raw_dir, f"{month}.jsonl")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            truncate_partial_line(path)
+        with open(path, "a") as f:
+            f.writelines(lines)
+        sizes[month] = os.path.getsize(path)
+    return sizes
+
+def read_raw_records(term: str, months: Iterable[str] = None) -> Iterator[Tuple[str, int, float]]:
+    """Yields (date, hash, score) records, only opening the requested months."""
+    if months is None:
+        months = list_raw_partitions(term)
+    for month in sorted(set(months)):
+        path = raw_partition_path(term, month)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r") as f:
+            for line in f:
+                # A last line without a newline is an interrupted append; it is
+                # truncated before the next append to the segment.
+                if not line.endswith("\n"):
+                    break
+                if line.strip():
+                    date_key, text_hash, score = json.loads(line)
+                    yield date_key, text_hash, score
+
+def load_post_hashes(term: str, date_keys: Iterable[str], summary: TermSummary) -> Set[int]:
+    """Returns the hashes already stored for the partitions covering date_keys.
+
+    Hashes migrated from scores-raw.json carry no date, so they are only
+    consulted when a post is dated on or before the migration.
+    """
+    date_keys = list(date_keys)
+    hashes = set(record[1] for record in read_raw_records(term, map(month_key, date_keys)))
+    if summary.legacy_cutoff and any(key <= summary.legacy_cutoff for key in date_keys):
+        hashes.update(load_legacy_hashes(term))
+    hashes.discard(None)
+    return hashes
+
+def load_legacy_hashes(term: str) -> Set[int]:
+    path = os.path.join(ensure_term_dir(term), RAW_DIR_NAME, LEGACY_HASHES_FILE)
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r") as f:
+        return set(int(line) for line in f if line.strip())
 
 def load_raw_data(term: str) -> RawData:
+    migrate_legacy_raw_data(term)
+    raw_data = RawData(post_texts=load_legacy_hashes(term))
+    for date_key, text_hash, score in read_raw_records(term):
+        raw_data.scores.setdefault(date_key, []).append(score)
+        if text_hash is not None:
+            raw_data.post_texts.add(text_hash)
+    return raw_data
+
+def dump_json_atomic(path: str, data, **kwargs):
+    """Writes JSON to a temp file and renames it over path, so readers never see a partial file."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp_path, path)
+
+def serialize_summary(term: str, summary: TermSummary):
     term_dir = ensure_term_dir(term)
-    path = os.path.join(term_dir, "scores-raw.json")
+    dump_json_atomic(os.path.join(term_dir, SUMMARY_FILE), summary.to_dict(), indent=2, sort_keys=True)
+
+def load_summary(term: str) -> TermSummary:
+    """
+    Loads the summary, first rebuilding any month whose segment size differs
+    from the one recorded, e.g. after a crash between appending and saving.
+    """
+    path = os.path.join(ensure_term_dir(term), SUMMARY_FILE)
+    summary = TermSummary()
     if os.path.exists(path):
         with open(path, "r") as f:
-            return RawData.from_dict(json.load(f))
-    return RawData()
+            summary = TermSummary.from_dict(json.load(f))
+
+    sizes = read_segment_sizes(term)
+    stale = set(month for month in set(sizes) | set(summary.segment_sizes) if sizes.get(month) != summary.segment_sizes.get(month))
+    if stale:
+        summary = rebuild_summary(term, summary, stale)
+        serialize_summary(term, summary)
+    return summary
+
+def rebuild_summary(term: str, summary: TermSummary, months: Iterable[str] = None) -> TermSummary:
+    """Recomputes the daily totals of the given months (all of them by default) from the raw segments."""
+    sizes = read_segment_sizes(term)
+    months = set(sizes) | set(summary.segment_sizes) if months is None else set(months)
+    rebuilt = TermSummary(
+        days={key: totals for key, totals in summary.days.items() if month_key(key) not in months},
+        legacy_cutoff=summary.legacy_cutoff,
+        segment_sizes={month: size for month, size in summary.segment_sizes.items() if month not in months},
+    )
+    rebuilt.segment_sizes.update((month, sizes[month]) for month in months if month in sizes)
+    for date_key, _, score in read_raw_records(term, months):
+        rebuilt.add(date_key, score)
+    return rebuilt
+
+def migrate_legacy_raw_data(term: str):
+    """
+    Splits a monolithic scores-raw.json into monthly segments and a summary.
+
+    Everything is written to a staging directory first and moved into place
+    with renames, so an interrupted migration is either redone from scratch or
+    finished on the next run, never applied twice.
+    """
+    term_dir = ensure_term_dir(term)
+    legacy_path = os.path.join(term_dir, LEGACY_RAW_FILE)
+    if not os.path.exists(legacy_path):
+        return
+
+    raw_dir = os.path.join(term_dir, RAW_DIR_NAME)
+    if not os.path.exists(raw_dir):
+        staging_dir = os.path.join(term_dir, MIGRATION_STAGING_DIR)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+
+        with open(legacy_path, "r") as f:
+            legacy = RawData.from_dict(json.load(f))
+
+        summary = TermSummary()
+        records = []
+        for date_key, scores in legacy.scores.items():
+            for score in scores:
+                records.append((date_key, None, score))
+                summary.add(date_key, score)
+        summary.segment_sizes = append_raw_records(term, records, raw_dir=staging_dir)
+
+        with open(os.path.join(staging_dir, LEGACY_HASHES_FILE), "w") as f:
+            f.writelines(f"{text_hash}\n" for text_hash in sorted(legacy.post_texts))
+
+        summary.legacy_cutoff = max(legacy.scores.keys(), default=None)
+        dump_json_atomic(os.path.join(staging_dir, SUMMARY_FILE), summary.to_dict(), indent=2, sort_keys=True)
+        os.rename(staging_dir, raw_dir)
+
+    # The staged summary travels with raw/ and is moved out last; if it is
+    # already gone, an earlier run got this far and only the cleanup is left.
+    staged_summary = os.path.join(raw_dir, SUMMARY_FILE)
+    if os.path.exists(staged_summary):
+        os.replace(staged_summary, os.path.join(term_dir, SUMMARY_FILE))
+    os.remove(legacy_path)
 
 def serialize_avg_data(term: str, avg_data: Dict[str, float]):
     term_dir = ensure_term_dir(term)
@@ -102,6 +315,9 @@ def load_avg_sentiment_scores(term):
         return json.load(f)
 
 def compute_smoothed_avg(raw_data: Dict[str, List[float]]) -> Dict[str, float]:
+    return compute_smoothed_avg_from_totals({key: [len(posts), sum(posts)] for key, posts in raw_data.items()})
+
+def compute_smoothed_avg_from_totals(daily_totals: Dict[str, List[float]]) -> Dict[str, float]:
     today = datetime.now(ZoneInfo("UTC")).date()
     date_range = [today - timedelta(days=i) for i in range(DAYS)]
     smoothed = {}
@@ -116,18 +332,18 @@ def compute_smoothed_avg(raw_data: Dict[str, List[float]]) -> Dict[str, float]:
         for offset in range(-MIN_INITIAL_DAYS, 1):
             nearby_date = date + timedelta(days=offset)
             key = str(nearby_date)
-            if key in raw_data:
-                posts = raw_data[key]
-                weighted_sum += sum(posts)
-                total_posts += len(posts)
+            if key in daily_totals:
+                count, total = daily_totals[key]
+                weighted_sum += total
+                total_posts += count
         if total_posts < MIN_POSTS_FOR_AVG:
             for offset in range(-MIN_INITIAL_DAYS - 1, -MAX_LOOKBACK_DAYS - 1, -1):
                 nearby_date = date + timedelta(days=offset)
                 key = str(nearby_date)
-                if key in raw_data:
-                    posts = raw_data[key]
-                    weighted_sum += sum(posts)
-                    total_posts += len(posts)
+                if key in daily_totals:
+                    count, total = daily_totals[key]
+                    weighted_sum += total
+                    total_posts += count
                 if total_posts >= MIN_POSTS_FOR_AVG:
                     break
 
@@ -137,23 +353,30 @@ def compute_smoothed_avg(raw_data: Dict[str, List[float]]) -> Dict[str, float]:
 
 def update_term(term: str):
     posts = search_reddit(term, limit=100)
-    raw_data = load_raw_data(term)
+    migrate_legacy_raw_data(term)
+    summary = load_summary(term)
 
-    for post in posts:
-        created_date = datetime.fromtimestamp(post[1]).date()
-        date_key = str(created_date)
-        text = post[0]
+    dated_posts = [(str(datetime.fromtimestamp(post[1]).date()), post[0]) for post in posts]
+    seen_hashes = load_post_hashes(term, [date_key for date_key, _ in dated_posts], summary)
+    new_records = []
+
+    for date_key, text in dated_posts:
         text_hash = stable_hash(text)
 
-        if text_hash not in raw_data.post_texts:
+        if text_hash not in seen_hashes:
             sentiment_score = analyze_post_sentiment(text)
-            raw_data.post_texts.add(text_hash)
-            if date_key not in raw_data.scores:
-                raw_data.scores[date_key] = []
-            raw_data.scores[date_key].append(sentiment_score)
-
-    serialize_raw_data(term, raw_data)
-    smoothed_avg = compute_smoothed_avg(raw_data.scores)
+            seen_hashes.add(text_hash)
+            new_records.append((date_key, text_hash, sentiment_score))
+
+    save_new_records(term, summary, new_records)
+
+def save_new_records(term: str, summary: TermSummary, records: List[Tuple[str, int, float]]):
+    """Appends records to the raw segments, then rewrites the summary and smoothed averages."""
+    summary.segment_sizes.update(append_raw_records(term, records))
+    for date_key, _, score in records:
+        summary.add(date_key, score)
+    serialize_summary(term, summary)
+    smoothed_avg = compute_smoothed_avg_from_totals(summary.days)
     serialize_avg_data(term, smoothed_avg)
 
 def update_all_terms():
@@ -202,8 +425,8 @@ def get_newsworthy_terms(term_list: List[str]) -> List[str]:
 
 def recompute_all_smoothed_scores():
     for term in get_term_list():
-        raw_data = load_raw_data(term)
-        smoothed_avg = compute_smoothed_avg(raw_data.scores)
+        migrate_legacy_raw_data(term)
+        smoothed_avg = compute_smoothed_avg_from_totals(load_summary(term).days)
         serialize_avg_data(term, smoothed_avg)
 
 if __name__ == "__main__":